@@ -1,79 +1,365 @@
 import os
-import json
-import requests
-from dotenv import load_dotenv
+import re
+import time
+import functools
+import orjson
+import sqlite3
+import threading
 
-# Load environment variables
-load_dotenv()
+# requests, httpx, python-dotenv and asyncio are imported on first use rather
+# than here, so importing this module (e.g. just for classify_intent) stays fast.
 
-# Load Gemini API Key
-GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
+# Settings read from the environment / .env by _load_env() on first use.
+# None means "not set"; assigning a value on the module overrides the env.
+GEMINI_API_KEY = None
+
+# Set USE_LLM_WRAPPER=false to return tool output (add/complete/list) directly
+# instead of having Gemini rephrase it. Chat messages always go to Gemini.
+USE_LLM_WRAPPER = None
+
+_env_loaded = False
 
 # --- 🛠️ FIX APPLIED HERE ---
 # Correct REST endpoint (using stable model name: gemini-2.5-flash)
 API_URL = "https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash:generateContent"
+# Same model, streaming the reply back as server-sent events
+STREAM_API_URL = "https://generativelanguage.googleapis.com/v1/models/gemini-2.5-flash:streamGenerateContent"
+
+# Query parameters sent with every Gemini request (kept in sync with
+# GEMINI_API_KEY by _load_env)
+_PARAMS = {}
+_STREAM_PARAMS = {}
+
+# Seconds to wait for Gemini before giving up on a request
+REQUEST_TIMEOUT = 30
+
+_session = None
+
+
+def _load_env():
+    """
+    Loads environment variables from .env (once), fills in any setting that
+    hasn't been set on the module, and syncs the request params with the key.
+    """
+    global _env_loaded, GEMINI_API_KEY, USE_LLM_WRAPPER
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        # Load environment variables
+        load_dotenv()
+        _env_loaded = True
+
+    # Load Gemini API Key
+    if GEMINI_API_KEY is None:
+        GEMINI_API_KEY = os.getenv("GOOGLE_API_KEY")
+    if USE_LLM_WRAPPER is None:
+        USE_LLM_WRAPPER = os.getenv("USE_LLM_WRAPPER", "true").strip().lower() not in ("0", "false", "no", "off")
+
+    if _PARAMS.get("key") != GEMINI_API_KEY:
+        _PARAMS["key"] = GEMINI_API_KEY
+        _STREAM_PARAMS.update(_PARAMS, alt="sse")
+
+
+def _get_session():
+    """
+    Returns the shared requests session, creating it on first use. Repeated
+    calls reuse its pooled keep-alive connections instead of paying for a new
+    TCP + TLS handshake each time.
+    """
+    global _session
+    if _session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        session.headers.update({"Content-Type": "application/json"})
+        session.mount("https://", HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=10,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"POST"}),
+                raise_on_status=False,
+            ),
+        ))
+        _session = session
+    return _session
 
 
 # ------------------------
 # Gemini Request Function
 # ------------------------
-def call_gemini(prompt):
+class _GeminiError(Exception):
+    """Raised inside _cached_gemini so failed calls are never cached."""
+
+
+def call_gemini(prompt, cache=True):
     """
     Makes a REST API call to the Gemini generateContent endpoint.
+    Replies to identical prompts are served from an LRU cache unless
+    cache=False (e.g. for open-ended chat, where variety is expected).
     """
+    if not cache:
+        return _request_gemini(prompt)
+    try:
+        return _cached_gemini(prompt)
+    except _GeminiError as e:
+        return str(e)
+
+
+@functools.lru_cache(maxsize=512)
+def _cached_gemini(prompt):
+    reply = _request_gemini(prompt)
+    if reply.startswith("❌"):
+        raise _GeminiError(reply)
+    return reply
+
+
+def _request_gemini(prompt):
+    """Sends a single prompt to Gemini and returns the reply text."""
+    import requests
+
+    _load_env()
     if not GEMINI_API_KEY:
         return "❌ ERROR: Missing GOOGLE_API_KEY in .env"
 
-    headers = {"Content-Type": "application/json"}
-    params = {"key": GEMINI_API_KEY}
+    data = {"contents": [{"parts": [{"text": prompt}]}]}
 
-    data = {
-        "contents": [
-            {
-                "parts": [
-                    {"text": prompt}
-                ]
-            }
-        ]
-    }
+    try:
+        response = _get_session().post(API_URL, params=_PARAMS, json=data, timeout=REQUEST_TIMEOUT)
+    except requests.RequestException as e:
+        # Network failures (timeouts, refused connections, exhausted retries)
+        return f"❌ Gemini API Error: {e}"
 
-    response = requests.post(API_URL, headers=headers, params=params, json=data)
+    return _parse_gemini_response(response)
 
-    try:
-        response.raise_for_status()
-    except Exception:
+
+def _parse_gemini_response(response):
+    """Extracts the generated text from a requests or httpx response."""
+    if response.status_code >= 400:
         # Returns the full error response text if status code indicates failure (4xx or 5xx)
         return f"❌ Gemini API Error: {response.text}"
 
     # Extract the generated text from the successful response
     try:
         return response.json()["candidates"][0]["content"]["parts"][0]["text"]
-    except KeyError:
+    except (KeyError, IndexError, ValueError):
+        # Missing fields, no candidates (e.g. blocked prompt) or a non-JSON body
         return "❌ Error: Could not parse response from Gemini."
 
 
+def call_gemini_batch(prompts, cache=True):
+    """
+    Answers several independent prompts with a single Gemini call and returns
+    one reply per prompt, in order. Falls back to one call per prompt if the
+    combined reply can't be split back into separate answers.
+    """
+    if len(prompts) <= 1:
+        return [call_gemini(p, cache) for p in prompts]
+
+    queries = "\n\n".join(f"### Query {i}\n{p.strip()}" for i, p in enumerate(prompts, 1))
+    batch_prompt = f"""
+Answer each of the {len(prompts)} numbered queries below separately, as if it were the only one.
+Reply with only a JSON array of {len(prompts)} strings, where item N is your answer to Query N.
+
+{queries}
+"""
+    reply = call_gemini(batch_prompt, cache)
+    if reply.startswith("❌"):
+        return [reply] * len(prompts)
+
+    answers = _split_batch_reply(reply, len(prompts))
+    if answers is None:
+        return [call_gemini(p, cache) for p in prompts]
+    return answers
+
+
+def _split_batch_reply(reply, count):
+    """Parses the JSON array returned for a batch prompt, or returns None."""
+    # The model sometimes wraps the array in a ```json code fence
+    start, end = reply.find("["), reply.rfind("]")
+    if start == -1 or end < start:
+        return None
+    try:
+        answers = orjson.loads(reply[start:end + 1])
+    except orjson.JSONDecodeError:
+        return None
+    if not isinstance(answers, list) or len(answers) != count:
+        return None
+    if not all(isinstance(a, str) for a in answers):
+        return None
+    return answers
+
+
+def stream_gemini(prompt):
+    """
+    Streams a reply from the Gemini streamGenerateContent endpoint, yielding
+    text chunks as soon as they arrive. Errors are yielded as a "❌" string.
+    """
+    import requests
+
+    _load_env()
+    if not GEMINI_API_KEY:
+        yield "❌ ERROR: Missing GOOGLE_API_KEY in .env"
+        return
+
+    data = {"contents": [{"parts": [{"text": prompt}]}]}
+
+    try:
+        with _get_session().post(STREAM_API_URL, params=_STREAM_PARAMS, json=data,
+                                 timeout=REQUEST_TIMEOUT, stream=True) as response:
+            if not response.ok:
+                yield f"❌ Gemini API Error: {response.text}"
+                return
+
+            # Each event arrives as a "data: {...}" line holding a partial reply
+            for line in response.iter_lines():
+                if not line.startswith(b"data:"):
+                    continue
+                try:
+                    chunk = orjson.loads(line[5:])
+                    yield chunk["candidates"][0]["content"]["parts"][0]["text"]
+                except (orjson.JSONDecodeError, KeyError, IndexError):
+                    # e.g. a final event carrying only the finish reason
+                    continue
+    except requests.RequestException as e:
+        # Network failures (timeouts, refused connections, exhausted retries)
+        yield f"❌ Gemini API Error: {e}"
+
+
+async def call_gemini_async(prompt, client):
+    """
+    Async version of call_gemini, sending the request through a shared
+    httpx.AsyncClient so many calls can be in flight at once.
+    """
+    import httpx
+
+    _load_env()
+    if not GEMINI_API_KEY:
+        return "❌ ERROR: Missing GOOGLE_API_KEY in .env"
+
+    data = {"contents": [{"parts": [{"text": prompt}]}]}
+
+    try:
+        response = await client.post(API_URL, params=_PARAMS, json=data)
+    except httpx.HTTPError as e:
+        # Network failures (timeouts, refused connections)
+        return f"❌ Gemini API Error: {e}"
+
+    return _parse_gemini_response(response)
+
+
 # ------------------------
-# JSON Task Storage
+# SQLite Task Storage
 # ------------------------
+TASK_DB = "tasks.db"
+
+# Older versions stored tasks in this JSON file; it is imported into the
+# database the first time the database is created.
 TASK_FILE = "tasks.json"
 
-def load_tasks():
-    """Loads tasks from the tasks.json file."""
-    try:
-        with open(TASK_FILE, "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        # Create an empty list if the file doesn't exist
+# Stored in the database's user_version once tasks.json has been imported, so
+# the import never runs again (e.g. after every task has been deleted).
+_SCHEMA_VERSION = 1
+
+_conn = None
+
+# In-memory copy of the tasks table. It is updated alongside this process's own
+# writes and only re-queried when another process (e.g. `python agent.py` next
+# to the Streamlit app) has committed changes, as reported by data_version.
+_tasks_cache = None
+_data_version = None
+# Maps task id -> position in _tasks_cache for O(1) lookups by id.
+_id_index = {}
+# Guards the cache and serialises use of the shared SQLite connection.
+_cache_lock = threading.RLock()
+
+def _read_task_file():
+    """Reads and parses the legacy tasks.json file."""
+    # Nothing to import if the file doesn't exist (the usual case)
+    if not os.path.exists(TASK_FILE):
         return []
-    except json.JSONDecodeError:
+    try:
+        with open(TASK_FILE, "rb") as f:
+            return orjson.loads(f.read())
+    except orjson.JSONDecodeError:
         # Handle case where file is corrupt/empty
         print(f"Warning: {TASK_FILE} is empty or invalid. Starting with empty list.")
         return []
 
+def _get_conn():
+    """Returns the shared SQLite connection, creating the database on first use."""
+    global _conn
+    with _cache_lock:
+        if _conn is None:
+            conn = sqlite3.connect(TASK_DB, isolation_level=None, check_same_thread=False)
+            # WAL lets readers and the writer work concurrently, and with
+            # synchronous=NORMAL a commit doesn't wait for an fsync.
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tasks ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, task TEXT NOT NULL, status TEXT NOT NULL)"
+            )
+            if conn.execute("PRAGMA user_version").fetchone()[0] < _SCHEMA_VERSION:
+                if conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is None:
+                    _write_all(conn, _read_task_file())
+                conn.execute(f"PRAGMA user_version = {_SCHEMA_VERSION}")
+            _conn = conn
+        return _conn
+
+def _write_all(conn, tasks):
+    """Replaces every row of the tasks table with the given tasks."""
+    with conn:
+        conn.execute("BEGIN")
+        conn.execute("DELETE FROM tasks")
+        conn.executemany(
+            "INSERT INTO tasks (id, task, status) VALUES (?, ?, ?)",
+            [(t["id"], t["task"], t["status"]) for t in tasks],
+        )
+
+def _set_cache(tasks):
+    """Replaces the cached task list and rebuilds the id index."""
+    global _tasks_cache, _id_index
+    _tasks_cache = tasks
+    _id_index = {t["id"]: i for i, t in enumerate(tasks)}
+
+def _reload_cache(conn):
+    """Re-reads every task from the database into the cache."""
+    global _data_version
+    _data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    rows = conn.execute("SELECT id, task, status FROM tasks ORDER BY id")
+    _set_cache([{"id": i, "task": task, "status": status} for i, task, status in rows])
+
+def _get_cache():
+    """
+    Returns the cached task list, loading it from the database on first use
+    and again whenever another connection has changed the database.
+    """
+    with _cache_lock:
+        conn = _get_conn()
+        # data_version only changes when *another* connection commits, so this
+        # process's own writes (already applied to the cache) don't trigger it.
+        if _tasks_cache is None or conn.execute("PRAGMA data_version").fetchone()[0] != _data_version:
+            _reload_cache(conn)
+        return _tasks_cache
+
+def load_tasks():
+    """Returns a copy of the current tasks."""
+    return list(_get_cache())
+
 def save_tasks(tasks):
-    """Saves the current list of tasks to the tasks.json file."""
-    with open(TASK_FILE, "w") as f:
-        json.dump(tasks, f, indent=2)
+    """
+    Replaces all stored tasks with the given list. This also removes rows that
+    other processes added, so the tools below write single rows instead.
+    """
+    with _cache_lock:
+        tasks = list(tasks)
+        _write_all(_get_conn(), tasks)
+        _set_cache(tasks)
 
 
 # ------------------------
@@ -81,55 +367,77 @@ def save_tasks(tasks):
 # ------------------------
 def add_task(task_desc):
     """Adds a new task to the list."""
-    tasks = load_tasks()
-    # Find the next available ID
-    task_id = max([t['id'] for t in tasks], default=0) + 1
-    tasks.append({"id": task_id, "task": task_desc, "status": "pending"})
-    save_tasks(tasks)
+    with _cache_lock:
+        tasks = _get_cache()
+        # The database hands out the next ID, never reusing deleted ones
+        task_id = _conn.execute(
+            "INSERT INTO tasks (task, status) VALUES (?, 'pending')", (task_desc,)
+        ).lastrowid
+        _id_index[task_id] = len(tasks)
+        tasks.append({"id": task_id, "task": task_desc, "status": "pending"})
     return f"Task added: {task_desc} (ID: {task_id})"
 
 def complete_task(task_id):
     """Marks a task as completed by ID."""
-    tasks = load_tasks()
     try:
         task_id = int(task_id) # Ensure ID is integer
     except ValueError:
         return "Error: Task ID must be a number."
-        
-    for t in tasks:
-        if t["id"] == task_id:
-            t["status"] = "completed"
-            save_tasks(tasks)
-            return f"Marked task {task_id} ('{t['task']}') as completed."
-    return f"Task ID {task_id} not found."
+
+    with _cache_lock:
+        tasks = _get_cache()
+        # The database, not the cache, decides whether the task exists
+        updated = _conn.execute("UPDATE tasks SET status = 'completed' WHERE id = ?", (task_id,))
+        if updated.rowcount == 0:
+            return f"Task ID {task_id} not found."
+        i = _id_index.get(task_id)
+        if i is None:
+            # Added by another process since the cache was checked
+            _reload_cache(_conn)
+            tasks, i = _tasks_cache, _id_index.get(task_id)
+            if i is None:
+                # ...and deleted again before the reload read it back
+                return f"Task ID {task_id} not found."
+        t = tasks[i]
+        t["status"] = "completed"
+    return f"Marked task {task_id} ('{t['task']}') as completed."
 
 def list_tasks():
     """Returns a formatted string of all tasks."""
-    tasks = load_tasks()
-    if not tasks:
-        return "You have no tasks."
-    
-    result = "Here are your tasks:\n"
-    for t in tasks:
+    with _cache_lock:
+        # Read the cached list in place; holding the lock makes a copy unnecessary
+        tasks = _get_cache()
+        if not tasks:
+            return "You have no tasks."
+
+        lines = ["Here are your tasks:"]
         # Use simple status emoji for better readability
-        status_icon = "✅" if t['status'] == 'completed' else "⏳"
-        result += f"{t['id']}. {status_icon} {t['task']} — {t['status'].upper()}\n"
-    return result
+        lines.extend(
+            f"{t['id']}. {'✅' if t['status'] == 'completed' else '⏳'} {t['task']} — {t['status'].upper()}"
+            for t in tasks
+        )
+    return "\n".join(lines) + "\n"
 
 
 # ------------------------
 # Intent Classifier
 # ------------------------
+# Intents in priority order: when a message contains keywords for several
+# intents, the earliest one in this list wins.
+_INTENTS = (
+    ("add_task", ("add task", "remember", "todo", "new task")),
+    ("complete_task", ("complete", "done", "finish", "mark as complete")),
+    ("list_tasks", ("list", "show tasks", "what are my tasks")),
+)
+
 def classify_intent(message):
     """Simple keyword-based intent classification."""
     msg = message.lower()
 
-    if "add task" in msg or "remember" in msg or "todo" in msg or "new task" in msg:
-        return "add_task"
-    if "complete" in msg or "done" in msg or "finish" in msg or "mark as complete" in msg:
-        return "complete_task"
-    if "list" in msg or "show tasks" in msg or "what are my tasks" in msg:
-        return "list_tasks"
+    # Plain substring checks run in C and beat a regex scan over the message
+    for intent, keywords in _INTENTS:
+        if any(k in msg for k in keywords):
+            return intent
 
     return "chat"
 
@@ -137,38 +445,39 @@ def classify_intent(message):
 # ------------------------
 # Main Gemini Agent
 # ------------------------
-def ai_agent(user_input):
-    """
-    Main function for the Agent.
-    1. Classifies user intent.
-    2. Executes the corresponding tool (if applicable).
-    3. Sends tool output and user input to Gemini for a natural response.
-    """
+# The add_task keywords, stripped from a message to get the task description
+_STRIP_RE = re.compile(r"\b(?:" + "|".join(map(re.escape, _INTENTS[0][1])) + r")\b", re.I)
 
-    intent = classify_intent(user_input)
+# First standalone number in a message, taken as the task ID
+_TASK_ID_RE = re.compile(r"\b\d+\b")
+
+def _run_tool(intent, user_input):
+    """Executes the tool for the given intent and returns its output (or None)."""
     tool_output = None
-    
-    print(f"-> Detected Intent: {intent}") # Debugging output
 
     # Route tasks to correct function
     if intent == "add_task":
         # Simple extraction of the task description after keywords
-        task_desc = user_input.replace("add task", "").replace("remember", "").replace("todo", "").strip()
+        task_desc = _STRIP_RE.sub("", user_input).strip()
         tool_output = add_task(task_desc)
 
     elif intent == "complete_task":
         # Extract the first number found in the string as the task ID
-        nums = [int(s) for s in user_input.split() if s.isdigit()]
-        if nums:
-            tool_output = complete_task(nums[0])
+        m = _TASK_ID_RE.search(user_input)
+        if m:
+            tool_output = complete_task(int(m.group()))
         else:
             tool_output = "Which task number would you like to mark as complete?"
 
     elif intent == "list_tasks":
         tool_output = list_tasks()
 
-    # --- Prompt for Gemini ---
-    prompt = f"""
+    return tool_output
+
+
+def _build_prompt(intent, tool_output, user_input):
+    """Builds the Gemini prompt that turns the tool output into a reply."""
+    return f"""
 You are a helpful and friendly productivity assistant named Nova.
 Your goal is to summarize the outcome of a user's action or simply chat with the user.
 
@@ -181,11 +490,29 @@ If Tool Output is present, acknowledge the task change (e.g., "I've added that t
 If the Intent is 'chat', simply respond to the User.
 User: {user_input}
 """
-    print("-> Calling Gemini...") # Debugging output
-    
-    # Call Gemini to generate the final, natural response
-    gemini_response = call_gemini(prompt)
 
+
+def _prepare(user_input):
+    """
+    Classifies the intent and runs its tool. Returns (intent, tool_output,
+    prompt), where prompt is None if the tool output can be returned as is.
+    """
+    intent = classify_intent(user_input)
+
+    print(f"-> Detected Intent: {intent}") # Debugging output
+
+    tool_output = _run_tool(intent, user_input)
+
+    _load_env()
+    # Tool output is already a complete answer; skip the Gemini round-trip
+    if not USE_LLM_WRAPPER and intent != "chat" and tool_output:
+        return intent, tool_output, None
+
+    return intent, tool_output, _build_prompt(intent, tool_output, user_input)
+
+
+def _finish(gemini_response):
+    """Turns a Gemini error string into the agent's error message."""
     # Check for API errors
     if gemini_response.startswith("❌"):
         return f"Agent encountered an internal error: {gemini_response}"
@@ -193,6 +520,129 @@ User: {user_input}
     return gemini_response
 
 
+def ai_agent(user_input):
+    """
+    Main function for the Agent.
+    1. Classifies user intent.
+    2. Executes the corresponding tool (if applicable).
+    3. Sends tool output and user input to Gemini for a natural response.
+    """
+    intent, tool_output, prompt = _prepare(user_input)
+    if prompt is None:
+        return tool_output
+
+    print("-> Calling Gemini...") # Debugging output
+
+    # Call Gemini to generate the final, natural response
+    # (chat replies aren't cached so repeated questions can get fresh answers)
+    return _finish(call_gemini(prompt, cache=intent != "chat"))
+
+
+async def ai_agent_async(user_input, client):
+    """Async version of ai_agent, using the given httpx.AsyncClient."""
+    _, tool_output, prompt = _prepare(user_input)
+    if prompt is None:
+        return tool_output
+
+    print("-> Calling Gemini...") # Debugging output
+
+    return _finish(await call_gemini_async(prompt, client))
+
+
+def ai_agent_stream(user_input):
+    """
+    Streaming version of ai_agent: yields the reply in chunks as Gemini
+    generates it, so callers can show the start of the answer right away.
+    """
+    _, tool_output, prompt = _prepare(user_input)
+    if prompt is None:
+        yield tool_output
+        return
+
+    print("-> Streaming from Gemini...") # Debugging output
+
+    for chunk in stream_gemini(prompt):
+        yield _finish(chunk)
+
+
+class _RateLimiter:
+    """
+    Token bucket allowing `rate` requests per second on average. The bucket
+    holds at least one token so rates below 1/s still let requests through.
+    """
+
+    def __init__(self, rate):
+        import asyncio
+
+        self.rate = rate
+        self.capacity = max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        import asyncio
+
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+async def _run_batch(inputs, max_concurrency, requests_per_second):
+    import asyncio
+    import httpx
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    limiter = _RateLimiter(requests_per_second) if requests_per_second else None
+
+    async with httpx.AsyncClient(timeout=REQUEST_TIMEOUT) as client:
+        async def run_one(user_input):
+            async with semaphore:
+                if limiter:
+                    await limiter.acquire()
+                return await ai_agent_async(user_input, client)
+
+        return await asyncio.gather(*(run_one(u) for u in inputs))
+
+
+def run_batch(inputs, max_concurrency=5, requests_per_second=None):
+    """
+    Runs the agent on several user inputs concurrently and returns the
+    responses in the same order. At most `max_concurrency` Gemini calls are
+    in flight at once, optionally capped at `requests_per_second`.
+    """
+    import asyncio
+
+    return asyncio.run(_run_batch(inputs, max_concurrency, requests_per_second))
+
+
+def ai_agent_batch(inputs):
+    """
+    Runs the agent on several user inputs in order, executing each tool
+    locally and then sending all prompts to Gemini in a single request.
+    """
+    prepared = [_prepare(user_input) for user_input in inputs]
+    responses = [tool_output for _, tool_output, _ in prepared]
+    pending = [i for i, (_, _, prompt) in enumerate(prepared) if prompt is not None]
+    if not pending:
+        return responses
+
+    print(f"-> Calling Gemini with {len(pending)} prompts...") # Debugging output
+
+    # Only cache the batch if none of the inputs is open-ended chat
+    cache = all(prepared[i][0] != "chat" for i in pending)
+    replies = call_gemini_batch([prepared[i][2] for i in pending], cache)
+    for i, reply in zip(pending, replies):
+        responses[i] = _finish(reply)
+    return responses
+
+
 # ------------------------
 # Example Usage
 # ------------------------
@@ -200,22 +650,22 @@ if __name__ == "__main__":
     
     print("\n--- Productivity Agent Initialized (using gemini-2.5-flash) ---\n")
 
-    # 1. Add Task
-    response1 = ai_agent("add task to buy groceries after work")
-    print(f"User: add task to buy groceries after work\nNova: {response1}\n")
-
-    # 2. Add another Task
-    response2 = ai_agent("remember to call the plumber tomorrow morning")
-    print(f"User: remember to call the plumber tomorrow morning\nNova: {response2}\n")
-    
-    # 3. List Tasks
-    response3 = ai_agent("show my tasks")
-    print(f"User: show my tasks\nNova: {response3}\n")
-    
-    # 4. Complete Task (assuming ID 1)
-    response4 = ai_agent("complete task 1")
-    print(f"User: complete task 1\nNova: {response4}\n")
-
-    # 5. Chat Intent
-    response5 = ai_agent("What is the capital of France?")
-    print(f"User: What is the capital of France?\nNova: {response5}\n")
+    inputs = [
+        "add task to buy groceries after work",  # 1. Add Task
+        "remember to call the plumber tomorrow morning",  # 2. Add another Task
+        "show my tasks",  # 3. List Tasks
+        "complete task 1",  # 4. Complete Task (assuming ID 1)
+    ]
+
+    # Tools run one after another, then a single Gemini call answers them all
+    for user_input, response in zip(inputs, ai_agent_batch(inputs)):
+        print(f"User: {user_input}\nNova: {response}\n")
+
+    # 5. Chat Intent, streamed so the answer is printed as it's generated
+    question = "What is the capital of France?"
+    stream = ai_agent_stream(question)
+    first_chunk = next(stream, "")
+    print(f"User: {question}\nNova: {first_chunk}", end="", flush=True)
+    for chunk in stream:
+        print(chunk, end="", flush=True)
+    print("\n")